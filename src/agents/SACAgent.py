@@ -5,8 +5,7 @@ https://spinningup.openai.com/en/latest/algorithms/sac.html#documentation-pytorc
 Source:
 https://github.com/openai/spinningup/blob/master/spinup/algos/pytorch/sac/sac.py
 """
-import itertools
-from copy import deepcopy
+import inspect
 
 import torch
 import numpy as np
@@ -19,6 +18,27 @@ from src.utils.utils import ActionSample
 
 from src.constants import DEVICE
 
+# Eager updates to run (on a side stream) before capturing the update as a CUDA graph.
+CUDA_GRAPH_WARMUP_STEPS = 3
+
+
+def _inductor_available():
+    """Check whether torch.compile can generate Triton kernels for the CUDA device.
+
+    Compilation is lazy, so without this check a missing Triton or an unsupported GPU
+    would only fail at the first update or act, long after the agent was built.
+
+    Returns:
+        bool: True if nn.Module.compile exists and Triton supports the device.
+    """
+    if not torch.cuda.is_available() or not hasattr(torch.nn.Module, "compile"):
+        return False
+    try:
+        from torch.utils._triton import has_triton
+    except ImportError:
+        return False
+    return has_triton()
+
 
 @yamlize
 class SACAgent(BaseAgent):
@@ -33,6 +53,8 @@ class SACAgent(BaseAgent):
         lr: float,
         actor_critic_cfg_path: str,
         load_checkpoint_from: str = "",
+        compile_networks: bool = True,
+        use_cuda_graph: bool = False,
     ):
         """Initialize Soft Actor-Critic Agent
 
@@ -44,16 +66,21 @@ class SACAgent(BaseAgent):
             lr (float): Learning rate parameter.
             actor_critic_cfg_path (str): Actor Critic Config Path
             load_checkpoint_from (str, optional): Load checkpoint from path. If '', then doesn't load anything. Defaults to ''.
+            compile_networks (bool, optional): Whether to torch.compile the actor-critic networks. Only applies on CUDA with a Triton build that supports the device; otherwise the policy is TorchScripted. Defaults to True.
+            use_cuda_graph (bool, optional): Whether to capture the update step as a CUDA graph and replay it. Only applies on CUDA. Defaults to False.
         """
 
         super(SACAgent, self).__init__()
 
         self.steps_to_sample_randomly = steps_to_sample_randomly
-        self.gamma = gamma
-        self.alpha = alpha
-        self.polyak = polyak
+        # Plain Python floats, so torch.compile can constant-fold them into the loss kernels.
+        self.gamma = float(gamma)
+        self.alpha = float(alpha)
+        self.polyak = float(polyak)
+        self.polyak_complement = 1.0 - self.polyak
         self.load_checkpoint_from = load_checkpoint_from
         self.lr = lr
+        self.use_cuda_graph = use_cuda_graph and torch.cuda.is_available()
 
         self.t = 0
         self.deterministic = False
@@ -68,18 +95,40 @@ class SACAgent(BaseAgent):
             actor_critic_cfg_path, NameToSourcePath.network
         )
         self.actor_critic.to(DEVICE)
-        self.actor_critic_target = deepcopy(self.actor_critic)
 
         if self.load_checkpoint_from != "":
             self.load_model(self.load_checkpoint_from)
 
-        self.q_params = itertools.chain(
-            self.actor_critic.q1.parameters(), self.actor_critic.q2.parameters()
+        # Build the target from the same config and copy the weights over, rather than
+        # deepcopying the (possibly compiled or scripted) online network.
+        self.actor_critic_target = create_configurable(
+            actor_critic_cfg_path, NameToSourcePath.network
         )
+        self.actor_critic_target.to(DEVICE)
+        self.actor_critic_target.load_state_dict(self.actor_critic.state_dict())
+
+        if compile_networks and _inductor_available():
+            self._compile_networks()
+        else:
+            # TorchScript and torch.compile do not stack, so only script the actor when
+            # not compiling. Parameters are shared with the eager module.
+            self.actor_critic.policy = torch.jit.script(self.actor_critic.policy)
 
-        # Set up optimizers for policy and q-function
-        self.pi_optimizer = Adam(self.actor_critic.policy.parameters(), lr=self.lr)
-        self.q_optimizer = Adam(self.q_params, lr=self.lr)
+        self.q_params = list(self.actor_critic.q1.parameters()) + list(
+            self.actor_critic.q2.parameters()
+        )
+        self.pi_params = list(self.actor_critic.policy.parameters())
+
+        # Set up optimizers for policy and q-function. On CUDA, the fused implementation
+        # (where this torch version has one) updates all parameters in a few kernels.
+        # Capturable optimizers keep their step counts on device so that optimizer.step()
+        # can be recorded in a CUDA graph.
+        # NB: The learning rate is baked into the graph when it is captured.
+        optimizer_kwargs = {"lr": self.lr, "capturable": self.use_cuda_graph}
+        if torch.cuda.is_available() and "fused" in inspect.signature(Adam).parameters:
+            optimizer_kwargs["fused"] = True
+        self.pi_optimizer = Adam(self.pi_params, **optimizer_kwargs)
+        self.q_optimizer = Adam(self.q_params, **optimizer_kwargs)
         self.pi_scheduler = (
             torch.optim.lr_scheduler.StepLR(  # TODO: Call some scheduler in runner.
                 self.pi_optimizer, 1, gamma=0.5
@@ -90,6 +139,38 @@ class SACAgent(BaseAgent):
         for p in self.actor_critic_target.parameters():
             p.requires_grad = False
 
+        # Parameter lists for the polyak update, matched by position.
+        self.ac_params = list(self.actor_critic.parameters())
+        self.ac_targ_params = list(self.actor_critic_target.parameters())
+
+        self.update_graph = None
+        self.graph_warmup_steps_left = CUDA_GRAPH_WARMUP_STEPS
+
+    @property
+    def captures_next_update(self):
+        """Whether the next call to update captures the CUDA graph.
+
+        No other thread may launch CUDA work (e.g. prefetching a batch) while the graph is being captured.
+        """
+        return (
+            self.use_cuda_graph
+            and self.update_graph is None
+            and self.graph_warmup_steps_left == 0
+        )
+
+    def _compile_networks(self):
+        """Compile the small MLPs used on every step, so their kernels are fused and their launches batched.
+
+        Submodules are compiled in place rather than wrapped, which keeps state_dict keys (and checkpoints) unchanged.
+        The q-functions and policy are compiled separately since they see different input shapes.
+        They replay their own CUDA graphs, unless the whole update is captured as one, since those graphs cannot nest.
+        """
+        mode = "default" if self.use_cuda_graph else "reduce-overhead"
+        for net in (self.actor_critic, self.actor_critic_target):
+            for name in ("q1", "q2", "policy", "speed_encoder"):
+                if hasattr(net, name):
+                    getattr(net, name).compile(mode=mode, dynamic=False)
+
     def select_action(self, obs):
         """Select action from obs.
 
@@ -97,7 +178,7 @@ class SACAgent(BaseAgent):
             obs (np.array): Observation to act on.
 
         Returns:
-            ActionObj: Action object.
+            ActionObj: Action object. On CUDA, its action array is reused and overwritten by the next call, so copy it to keep it.
         """
         # Until start_steps have elapsed, randomly sample actions
         # from a uniform distribution for better exploration. Afterwards,
@@ -166,10 +247,9 @@ class SACAgent(BaseAgent):
         loss_q2 = ((q2 - backup) ** 2).mean()
         loss_q = loss_q1 + loss_q2
 
-        # Useful info for logging
-        q_info = dict(
-            Q1Vals=q1.detach().cpu().numpy(), Q2Vals=q2.detach().cpu().numpy()
-        )
+        # Useful info for logging. Kept on device so the update does not sync with
+        # the host; convert with .cpu().numpy() only where it is actually logged.
+        q_info = dict(Q1Vals=q1.detach(), Q2Vals=q2.detach())
 
         return loss_q, q_info
 
@@ -184,45 +264,86 @@ class SACAgent(BaseAgent):
         # Entropy-regularized policy loss
         loss_pi = (self.alpha * logp_pi - q_pi).mean()
 
-        # Useful info for logging
-        pi_info = dict(LogPi=logp_pi.detach().cpu().numpy())
+        # Useful info for logging (on device, see _compute_loss_q).
+        pi_info = dict(LogPi=logp_pi.detach())
 
         return loss_pi, pi_info
 
     def update(self, data):
         """Update SAC Agent given data
 
+        On CUDA, the first few updates run eagerly; after that the update is captured once as a CUDA graph and
+        each call copies the batch into the graph's static inputs and replays it.
+
         Args:
             data (dict): Data from ReplayBuffer object.
         """
+        if not self.use_cuda_graph:
+            return self._update_step(data)
+
+        if self.update_graph is None:
+            if self.graph_warmup_steps_left > 0:
+                # Warm up on a side stream, as required before capture. This also
+                # triggers torch.compile and allocates the optimizer state.
+                self.graph_warmup_steps_left -= 1
+                side_stream = torch.cuda.Stream()
+                side_stream.wait_stream(torch.cuda.current_stream())
+                with torch.cuda.stream(side_stream):
+                    losses = self._update_step(data)
+                torch.cuda.current_stream().wait_stream(side_stream)
+                return losses
+            self._capture_update(data)
+        elif any(v.shape != self.static_data[k].shape for k, v in data.items()):
+            # The graph is specialized to one batch shape (e.g. a partial batch).
+            return self._update_step(data)
+
+        for k, v in data.items():
+            self.static_data[k].copy_(v)
+        self.update_graph.replay()
+        # Copy out, since the static outputs are overwritten by the next replay.
+        return tuple(loss.detach().clone() for loss in self.static_losses)
+
+    def _capture_update(self, data):
+        """Record one update step on static input tensors as a CUDA graph.
+
+        Args:
+            data (dict): Data from ReplayBuffer object, used for the static input shapes.
+        """
+        self.static_data = {k: v.clone() for k, v in data.items()}
+        self.update_graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(self.update_graph):
+            self.static_losses = self._update_step(self.static_data)
+
+    def _update_step(self, data):
+        """Run one SAC update step: Q-functions, then the policy, then the target networks.
+
+        Args:
+            data (dict): Data from ReplayBuffer object.
+
+        Returns:
+            tuple: Tuple of policy loss, Q loss
+        """
         # First run one gradient descent step for Q1 and Q2
         self.q_optimizer.zero_grad()
         loss_q, _ = self._compute_loss_q(data)
         loss_q.backward()
         self.q_optimizer.step()
 
-        # Freeze Q-networks so you don't waste computational effort
-        # computing gradients for them during the policy learning step.
-        for p in self.q_params:
-            p.requires_grad = False
-
-        # Next run one gradient descent step for pi.
-        self.pi_optimizer.zero_grad()
+        # Next run one gradient descent step for pi. Only take gradients w.r.t. the
+        # policy parameters, so no effort is wasted on gradients for the Q-networks
+        # and there is no need to freeze and unfreeze them around this step.
         loss_pi, _ = self._compute_loss_pi(data)
-        loss_pi.backward()
+        pi_grads = torch.autograd.grad(loss_pi, self.pi_params)
+        for p, g in zip(self.pi_params, pi_grads):
+            p.grad = g
         self.pi_optimizer.step()
 
-        # Unfreeze Q-networks so you can optimize it at next DDPG step.
-        for p in self.q_params:
-            p.requires_grad = True
-
         # Finally, update target networks by polyak averaging.
+        # NB: The foreach ops update every target parameter in place with a couple of
+        # multi-tensor kernels, instead of two tiny kernels per parameter.
         with torch.no_grad():
-            for p, p_targ in zip(
-                self.actor_critic.parameters(), self.actor_critic_target.parameters()
-            ):
-                # NB: We use an in-place operations "mul_", "add_" to update target
-                # params, as opposed to "mul" and "add", which would make new tensors.
-                p_targ.data.mul_(self.polyak)
-                p_targ.data.add_((1 - self.polyak) * p.data)
+            torch._foreach_mul_(self.ac_targ_params, self.polyak)
+            torch._foreach_add_(
+                self.ac_targ_params, self.ac_params, alpha=self.polyak_complement
+            )
         return (loss_pi, loss_q)
@@ -1,4 +1,5 @@
 """Default Replay Buffer."""
+import threading
 import torch
 import numpy as np
 from typing import Tuple
@@ -11,6 +12,9 @@ from src.constants import DEVICE
 class SimpleReplayBuffer:
     """
     A simple FIFO experience replay buffer for SAC agents.
+
+    store and sample_batch may be called from different threads; row writes
+    and batch gathers are serialized by an internal lock.
     """
 
     def __init__(self, obs_dim: int, act_dim: int, size: int, batch_size: int):
@@ -23,20 +27,75 @@ class SimpleReplayBuffer:
             batch_size (int): Batch size
         """
 
+        # Observations and actions are stored in fp16 to halve the buffer footprint and
+        # the host-to-device traffic per batch; sample_batch upcasts to fp32 after the copy.
+        # Rewards and dones are small and stay fp32.
         self.obs_buf = np.zeros(
-            (size, obs_dim), dtype=np.float32
+            (size, obs_dim), dtype=np.float16
         )  # +1:spd #core.combined_shape(size, obs_dim)
         self.obs2_buf = np.zeros(
-            (size, obs_dim), dtype=np.float32
+            (size, obs_dim), dtype=np.float16
         )  # +1:spd #core.combined_shape(size, obs_dim)
         self.act_buf = np.zeros(
-            (size, act_dim), dtype=np.float32
+            (size, act_dim), dtype=np.float16
         )  # core.combined_shape(size, act_dim)
         self.rew_buf = np.zeros(size, dtype=np.float32)
         self.done_buf = np.zeros(size, dtype=np.float32)
         self.ptr, self.size, self.max_size = 0, 0, size
         self.batch_size = batch_size
+        self._init_transient_state()
+
+    def _init_transient_state(self):
+        """Create the lock and reset the sample weights, pinned staging tensors and CUDA stream used by sample_batch, which are recreated lazily."""
+        self._lock = threading.Lock()
         self.weights = None
+        self._staging = None
+        self._copy_stream = None
+        self._copy_done = None
+
+    def __getstate__(self):
+        """Exclude the lock, device tensors and CUDA handles when pickling the buffer (e.g. for experiment state)."""
+        state = self.__dict__.copy()
+        for key in ("_lock", "weights", "_staging", "_copy_stream", "_copy_done"):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled buffer.
+
+        Args:
+            state (dict): State produced by __getstate__.
+        """
+        self.__dict__.update(state)
+        self._init_transient_state()
+
+    def _columns(self):
+        """Get the per-field storage arrays, keyed by batch name.
+
+        Returns:
+            dict: Map from batch key to storage array.
+        """
+        return dict(
+            obs=self.obs_buf,
+            obs2=self.obs2_buf,
+            act=self.act_buf,
+            rew=self.rew_buf,
+            done=self.done_buf,
+        )
+
+    @staticmethod
+    def _to_numpy(arraylike):
+        """Convert from tensor to nparray
+
+        Args:
+            arraylike (Torch.Tensor): Tensor to convert
+
+        Returns:
+            np.array: Converted numpyarray
+        """
+        if isinstance(arraylike, torch.Tensor):
+            return arraylike.detach().cpu().numpy()
+        return arraylike
 
     def store(self, buffer_dict):
         """Store data from buffer_dict
@@ -44,31 +103,39 @@ class SimpleReplayBuffer:
         Args:
             buffer_dict (_type_): Buffer dict
         """
-        # pdb.set_trace()
-
-        def convert(arraylike):
-            """Convert from tensor to nparray
-
-            Args:
-                arraylike (Torch.Tensor): Tensor to convert
-
-            Returns:
-                np.array: Converted numpyarray
-            """
-            obs = arraylike
-            if isinstance(obs, torch.Tensor):
-                if obs.requires_grad:
-                    obs = obs.detach()
-                obs = obs.cpu().numpy()
-            return obs
-
-        self.obs_buf[self.ptr] = convert(buffer_dict["obs"])
-        self.obs2_buf[self.ptr] = convert(buffer_dict["next_obs"])
-        self.act_buf[self.ptr] = buffer_dict["act"].action  # .detach().cpu().numpy()
-        self.rew_buf[self.ptr] = buffer_dict["rew"]
-        self.done_buf[self.ptr] = buffer_dict["done"]
-        self.ptr = (self.ptr + 1) % self.max_size
-        self.size = min(self.size + 1, self.max_size)
+        obs = self._to_numpy(buffer_dict["obs"])
+        next_obs = self._to_numpy(buffer_dict["next_obs"])
+        with self._lock:
+            self.obs_buf[self.ptr] = obs
+            self.obs2_buf[self.ptr] = next_obs
+            self.act_buf[self.ptr] = buffer_dict["act"].action
+            self.rew_buf[self.ptr] = buffer_dict["rew"]
+            self.done_buf[self.ptr] = buffer_dict["done"]
+            self.ptr = (self.ptr + 1) % self.max_size
+            self.size = min(self.size + 1, self.max_size)
+
+    def store_batch(self, obs, act, rew, next_obs, done):
+        """Store a batch of transitions with one write per field, e.g. from a rollout or vectorized envs.
+
+        Args:
+            obs (Union[np.array, torch.Tensor]): Observations, (n, obs_dim)
+            act (Union[np.array, torch.Tensor]): Actions, (n, act_dim)
+            rew (Union[np.array, torch.Tensor]): Rewards, (n,)
+            next_obs (Union[np.array, torch.Tensor]): Next observations, (n, obs_dim)
+            done (Union[np.array, torch.Tensor]): Done flags, (n,)
+        """
+        # Same order as _columns()
+        fields = [self._to_numpy(x) for x in (obs, next_obs, act, rew, done)]
+        n = len(fields[0])
+        # Only the newest max_size transitions fit; older ones would be overwritten anyway.
+        kept = min(n, self.max_size)
+        fields = [x[n - kept :] for x in fields]
+        with self._lock:
+            idxs = (self.ptr + np.arange(n - kept, n)) % self.max_size
+            for buf, x in zip(self._columns().values(), fields):
+                buf[idxs] = x
+            self.ptr = (self.ptr + n) % self.max_size
+            self.size = min(self.size + n, self.max_size)
 
     def sample_batch(self):
         """Sample batch from self.
@@ -76,24 +143,81 @@ class SimpleReplayBuffer:
         Returns:
             dict: Dictionary of batched information.
         """
+        batch, copy_done = self.sample_batch_async()
+        self.wait_for_batch(batch, copy_done)
+        return batch
 
-        idxs = np.random.choice(
-            self.size, size=min(self.batch_size, self.size), replace=False
-        )
-        batch = dict(
-            obs=self.obs_buf[idxs],
-            obs2=self.obs2_buf[idxs],
-            act=self.act_buf[idxs],
-            rew=self.rew_buf[idxs],
-            done=self.done_buf[idxs],
-        )
-        self.weights = torch.tensor(
-            np.zeros_like(idxs), dtype=torch.float32, device=DEVICE
-        )
-        return {
-            k: torch.tensor(v, dtype=torch.float32, device=DEVICE)
-            for k, v in batch.items()
-        }
+    def sample_batch_async(self):
+        """Sample batch from self, without ordering the current stream after its device copy.
+
+        Meant for sampling on a prefetch thread; the thread that uses the batch must
+        pass it to wait_for_batch first.
+
+        Returns:
+            Tuple[dict, Optional[torch.cuda.Event]]: Dictionary of batched information, and the event
+                recorded after its host-to-device copy (None on CPU).
+        """
+        use_cuda = torch.cuda.is_available()
+        if use_cuda and self._staging is None:
+            self._staging = {
+                k: torch.from_numpy(
+                    np.empty((self.batch_size,) + v.shape[1:], dtype=v.dtype)
+                ).pin_memory()
+                for k, v in self._columns().items()
+            }
+            self._copy_stream = torch.cuda.Stream()
+        # The staging tensors are reused, so the previous batch must have left
+        # host memory before we gather into them again.
+        if self._copy_done is not None:
+            self._copy_done.synchronize()
+
+        # Hold the lock while gathering so a concurrent store cannot hand us a
+        # half-written row; the device copy below runs without it.
+        with self._lock:
+            # Sample with replacement: np.random.choice(..., replace=False) permutes
+            # the whole buffer on every call, which is O(size) rather than O(batch).
+            idxs = np.random.randint(0, self.size, size=self.batch_size)
+            if not use_cuda:
+                batch = {
+                    k: torch.from_numpy(v[idxs]).float()
+                    for k, v in self._columns().items()
+                }
+            else:
+                for k, v in self._columns().items():
+                    np.take(v, idxs, axis=0, out=self._staging[k].numpy())
+        # Sampling is uniform, so every transition has unit importance weight. Allocate
+        # the weight vector once instead of building a new tensor per batch.
+        if self.weights is None:
+            self.weights = torch.ones(self.batch_size, device=DEVICE)
+        if not use_cuda:
+            return batch, None
+
+        # DMA from pinned memory on a side stream so the copy overlaps with
+        # work already queued on the compute stream.
+        batch = {}
+        with torch.cuda.stream(self._copy_stream):
+            for k, v in self._staging.items():
+                batch[k] = v.to(DEVICE, non_blocking=True).float()
+            self._copy_done = torch.cuda.Event()
+            self._copy_done.record()
+        return batch, self._copy_done
+
+    @staticmethod
+    def wait_for_batch(batch, copy_done):
+        """Order the current stream after a batch's host-to-device copy, before it is used.
+
+        Args:
+            batch (dict): Batch returned by sample_batch_async.
+            copy_done (Optional[torch.cuda.Event]): Event returned with the batch.
+        """
+        if copy_done is None:
+            return
+        compute_stream = torch.cuda.current_stream()
+        compute_stream.wait_event(copy_done)
+        # The batch was allocated on the copy stream; keep its memory from being
+        # reused there until the compute stream is done with it.
+        for v in batch.values():
+            v.record_stream(compute_stream)
 
     def finish_path(self, action_obj=None):
         """
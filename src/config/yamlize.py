@@ -3,6 +3,8 @@ try:
     from typing import get_type_hints, TypedDict, get_origin, get_args
 except ImportError:
     from typing_extensions import get_type_hints, TypedDict, get_origin, get_args
+import copy
+import functools
 import inspect
 import strictyaml as sl
 import yaml
@@ -172,6 +174,34 @@ class ConfigurableDict(TypedDict):
     config: dict
 
 
+@functools.lru_cache(maxsize=64)
+def _read_configurable_file(config_yaml):
+    """Parse a {name, config} config file. Cached, since the same files are parsed for every object built from them.
+
+    Args:
+        config_yaml (str): Config yaml location
+
+    Returns:
+        dict: Parsed config dict. Shared between callers, so do not mutate.
+    """
+    schema = sl.Map({"name": sl.Str(), "config": sl.Any()})
+    with open(config_yaml, "r") as mf:
+        yaml_contents = mf.read()
+    return sl.load(yaml_contents, schema).data
+
+
+def _load_configurable_file(config_yaml):
+    """Load a {name, config} config file through the parse cache.
+
+    Args:
+        config_yaml (str): Config yaml location
+
+    Returns:
+        dict: Config dict, safe for the caller to mutate.
+    """
+    return copy.deepcopy(_read_configurable_file(config_yaml))
+
+
 def create_configurable(config_yaml, name_to_path):
     """Create configurable object from config file path and source location
 
@@ -183,10 +213,7 @@ def create_configurable(config_yaml, name_to_path):
         object: Instantiated object.
     """
     name_to_path = str(name_to_path.value)
-    schema = sl.Map({"name": sl.Str(), "config": sl.Any()})
-    with open(config_yaml, "r") as mf:
-        yaml_contents = mf.read()
-        config_dict = sl.load(yaml_contents, schema).data
+    config_dict = _load_configurable_file(config_yaml)
     cls = getattr(importlib.import_module(name_to_path), config_dict["name"])
 
     return cls.instantiate_from_config_dict(config_dict["config"])
@@ -203,10 +230,7 @@ def get_configurable_dict(config_yaml, name_to_path):
         dict: Config Dict
     """
     name_to_path = str(name_to_path.value)
-    schema = sl.Map({"name": sl.Str(), "config": sl.Any()})
-    with open(config_yaml, "r") as mf:
-        yaml_contents = mf.read()
-        config_dict = sl.load(yaml_contents, schema).data
+    config_dict = _load_configurable_file(config_yaml)
     cls = getattr(importlib.import_module(name_to_path), config_dict["name"])
     return {
         "name": config_dict["name"],
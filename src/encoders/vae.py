@@ -74,6 +74,16 @@ class VAE(BaseEncoder, torch.nn.Module):
         else:
             self.load_state_dict(torch.load(load_checkpoint_from))
         # TODO: Figure out where speed encoder should go.
+        self._representation_fn = None
+        # bf16 only where the GPU has native support (sm_80+); newer torch also reports
+        # emulated bf16 as supported, which is slower than fp32. Otherwise use fp16.
+        self._autocast_dtype = (
+            torch.bfloat16
+            if torch.cuda.is_available()
+            and torch.cuda.is_bf16_supported()
+            and torch.cuda.get_device_capability()[0] >= 8
+            else torch.float16
+        )
 
     def reparameterize(self, mu, logvar):
         std = logvar.mul(0.5).exp_()
@@ -93,8 +103,24 @@ class VAE(BaseEncoder, torch.nn.Module):
     def encode(self, x: np.ndarray, device=DEVICE) -> torch.Tensor:
         # assume x is RGB image with shape (H, W, 3)
         h = crop_resize_center(x).unsqueeze(0)
-        v = self.representation(h)
-        return v
+        # inference only: no autograd graph, and half precision convs on CUDA
+        with torch.no_grad(), torch.autocast(
+            "cuda", dtype=self._autocast_dtype, enabled=h.is_cuda
+        ):
+            v = self._compiled_representation()(h)
+        # fp32 copy for the agent / buffer, which also moves it out of the CUDA graph's static output
+        return v.to(torch.float32, copy=True)
+
+    def _compiled_representation(self):
+        # compiled lazily and only for encode, so training the VAE stays eager
+        if self._representation_fn is None:
+            if torch.cuda.is_available() and hasattr(torch, "compile"):
+                self._representation_fn = torch.compile(
+                    self.representation, mode="reduce-overhead"
+                )
+            else:
+                self._representation_fn = self.representation
+        return self._representation_fn
 
     def distribution(self, x, device=DEVICE):
         # expects (N, H, W, C)
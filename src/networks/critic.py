@@ -1,11 +1,11 @@
 """Network definitions for all critic functions."""
+import math
 import torch
 import torch.nn as nn
 import numpy as np
 import torch.nn.functional as F
-from torch.distributions import Normal
 from enum import Enum
-from typing import List
+from typing import List, Optional, Tuple
 from src.config.yamlize import (
     yamlize,
     ConfigurableDict,
@@ -15,9 +15,27 @@ from src.config.yamlize import (
 from src.constants import DEVICE
 
 
+def _activation_layer(activation):
+    """Instantiate an activation that runs in place on its input when the activation supports it.
+
+    Args:
+        activation (nn.Module): Activation class
+
+    Returns:
+        nn.Module: Activation layer
+    """
+    try:
+        return activation(inplace=True)
+    except TypeError:
+        return activation()
+
+
 def mlp(sizes, activation=nn.ReLU, output_activation=nn.Identity):
     """Generate MLP from inputs
 
+    Activations are applied in place on each Linear output, so a Linear+ReLU pair does not allocate a second
+    intermediate tensor. Layers stay in a flat nn.Sequential, which keeps existing checkpoints loadable.
+
     Args:
         sizes (list[int]): List of sizes
         activation (nn.Module, optional): Activation function for hidden layers. Defaults to nn.ReLU.
@@ -29,7 +47,7 @@ def mlp(sizes, activation=nn.ReLU, output_activation=nn.Identity):
     layers = []
     for j in range(len(sizes) - 1):
         act = activation if j < len(sizes) - 2 else output_activation
-        layers += [nn.Linear(sizes[j], sizes[j + 1]), act()]
+        layers += [nn.Linear(sizes[j], sizes[j + 1]), _activation_layer(act)]
     return nn.Sequential(*layers)
 
 
@@ -55,10 +73,18 @@ class SquashedGaussianMLPActor(nn.Module):
         self.mu_layer = nn.Linear(hidden_sizes[-1], act_dim)
         self.log_std_layer = nn.Linear(hidden_sizes[-1], act_dim)
         self.act_limit = act_limit
+        # Module attributes rather than globals, so the forward can be scripted.
+        self.log_std_min = LOG_STD_MIN
+        self.log_std_max = LOG_STD_MAX
 
-    def forward(self, obs, deterministic=False, with_logprob=True):
+    def forward(
+        self, obs: torch.Tensor, deterministic: bool = False, with_logprob: bool = True
+    ) -> Tuple[torch.Tensor, Optional[torch.Tensor]]:
         """Get action from obs.
 
+        The Gaussian is written out explicitly rather than through torch.distributions, so that the actor can be
+        compiled with torch.jit.script.
+
         Args:
             obs (int): Observation
             deterministic (bool, optional): Whether to use means instead of rsample. Defaults to False.
@@ -70,29 +96,31 @@ class SquashedGaussianMLPActor(nn.Module):
         net_out = self.net(obs)
         mu = self.mu_layer(net_out)
         log_std = self.log_std_layer(net_out)
-        log_std = torch.clamp(log_std, LOG_STD_MIN, LOG_STD_MAX)
+        log_std = torch.clamp(log_std, self.log_std_min, self.log_std_max)
         std = torch.exp(log_std)
 
         # Pre-squash distribution and sample
-        pi_distribution = Normal(mu, std)
         if deterministic:
             # Only used for evaluating policy at test time.
             pi_action = mu
         else:
-            pi_action = pi_distribution.rsample()
+            pi_action = mu + std * torch.randn_like(mu)
 
+        logp_pi: Optional[torch.Tensor] = None
         if with_logprob:
             # Compute logprob from Gaussian, and then apply correction for Tanh squashing.
             # NOTE: The correction formula is a little bit magic. To get an understanding
             # of where it comes from, check out the original SAC paper (arXiv 1801.01290)
             # and look in appendix C. This is a more numerically-stable equivalent to Eq 21.
             # Try deriving it yourself as a (very difficult) exercise. :)
-            logp_pi = pi_distribution.log_prob(pi_action).sum(axis=-1)
-            logp_pi -= (2 * (np.log(2) - pi_action - F.softplus(-2 * pi_action))).sum(
-                axis=1
-            )
-        else:
-            logp_pi = None
+            logp_pi = (
+                -((pi_action - mu) ** 2) / (2 * std**2)
+                - log_std
+                - 0.5 * math.log(2 * math.pi)
+            ).sum(dim=-1)
+            logp_pi -= (
+                2 * (math.log(2.0) - pi_action - F.softplus(-2 * pi_action))
+            ).sum(dim=1)
 
         pi_action = torch.tanh(pi_action)
         pi_action = self.act_limit * pi_action
@@ -287,6 +315,22 @@ class ActorCritic(nn.Module):
         elif critic_cfg["name"] == "Vfunction":
             self.v = create_configurable_from_dict(critic_cfg, NameToSourcePath.network)
 
+        # Pinned host buffer that act copies single actions into, so each env step
+        # reuses one DMA target instead of allocating a new host tensor. It is allocated
+        # on the first CUDA act, so target networks and CPU models never pin memory.
+        self._act_host = None
+
+    def _features(self, obs_feat):
+        """
+        Build the policy input from the encoded observation. Slicing returns views, so the only copy is the
+        concatenation with the speed embedding when the speed encoder is used.
+        """
+        img_embed = obs_feat[..., : self.state_dim]  # n x latent_dims
+        if not self.use_speed:
+            return img_embed
+        speed = self.speed_encoder(obs_feat[..., self.state_dim :])
+        return torch.cat([img_embed, speed], dim=-1)
+
     def pi(self, obs_feat, deterministic=False):
         """
         Wrapper around the policy. Helps manage dimensions and add/remove features from the input space.
@@ -294,43 +338,26 @@ class ActorCritic(nn.Module):
 
         # if obs_feat.ndimension() == 1:
         #    obs_feat = obs_feat.unsqueeze(0)
-        if self.use_speed:
-            img_embed = obs_feat[..., : self.state_dim]
-            speed = self.speed_encoder(obs_feat[..., self.state_dim :])
-            feat = torch.cat([img_embed, speed], dim=-1)
-
-        else:
-            img_embed = obs_feat[..., : self.state_dim]  # n x latent_dims
-            feat = torch.cat(
-                [
-                    img_embed,
-                ],
-                dim=-1,
-            )
-        return self.policy(feat, deterministic, True)
+        return self.policy(self._features(obs_feat), deterministic, True)
 
     def act(self, obs_feat, deterministic=False):
         """
         Uses the policy to get and return an action on the appropriate device in the right format.
+        On CUDA, a single action is returned as a view of a reused host buffer, valid until the next call.
         """
         # if obs_feat.ndimension() == 1:
         #    obs_feat = obs_feat.unsqueeze(0)
         with torch.no_grad():
-            if self.use_speed:
-                img_embed = obs_feat[..., : self.state_dim]
-                speed = self.speed_encoder(obs_feat[..., self.state_dim :])
-                feat = torch.cat([img_embed, speed], dim=-1)
-            else:
-                img_embed = obs_feat[..., : self.state_dim]  # n x latent_dims
-                feat = torch.cat(
-                    [
-                        img_embed,
-                    ],
-                    dim=-1,
-                )
-            a, _ = self.policy(feat, deterministic, False)
+            a, _ = self.policy(self._features(obs_feat), deterministic, False)
             a = a.squeeze(0)
-        return a.numpy() if a.device == "cpu" else a.cpu().numpy()
+        if not a.is_cuda:
+            return a.numpy()
+        if self._act_host is None:
+            self._act_host = torch.empty(a.shape, dtype=a.dtype, pin_memory=True)
+        elif a.shape != self._act_host.shape:
+            return a.cpu().numpy()
+        self._act_host.copy_(a)
+        return self._act_host.numpy()
 
 
 @yamlize
@@ -403,7 +430,7 @@ class IQN(nn.Module):
             speed = self.speed_encoder(input[..., self.state_dim :])
             input = torch.cat([img_embed, speed], dim=-1)
         else:
-            img_embed = input[..., : self.state_dim]
+            input = input[..., : self.state_dim]
 
         x = torch.relu(self.head(input))
         cos, taus = self._calc_cos(batch_size)  # cos shape (batch, num_tau, layer_size)
@@ -1,6 +1,7 @@
 """Generalized runner for single-process RL. Takes in encoded observations, applies them to a buffer, and trains."""
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from matplotlib.font_manager import json_dump
 import numpy as np
 import wandb
@@ -128,6 +129,9 @@ class ModelFreeRunner(BaseRunner):
             self.replay_buffer = running_vars["buffer"]
             self.best_eval_ret = running_vars["current_best_eval_ret"]
 
+        # Single worker that samples the next batch while the agent updates on the current one.
+        self.batch_prefetcher = ThreadPoolExecutor(max_workers=1)
+
         if use_container:
             self.env_wrapped = EnvContainer(self.encoder)
         else:
@@ -206,8 +210,20 @@ class ModelFreeRunner(BaseRunner):
                 if (t >= self.update_model_after) and (
                     t % self.update_model_every == 0
                 ):
-                    for _ in range(self.model_update_iter):
-                        batch = self.replay_buffer.sample_batch()
+                    next_batch = self.batch_prefetcher.submit(self._sample_batch)
+                    for i in range(self.model_update_iter):
+                        batch, copy_done = next_batch.result()
+                        # Wait for the copy on this thread's stream, so only the update that uses it does.
+                        if copy_done is not None:
+                            self.replay_buffer.wait_for_batch(batch, copy_done)
+                        # Never prefetch past the last update, so sampling does not overlap with store.
+                        if i < self.model_update_iter - 1:
+                            next_batch = self.batch_prefetcher.submit(
+                                self._sample_batch
+                            )
+                        if getattr(self.agent, "captures_next_update", False):
+                            # Let the prefetch finish, since it must not touch CUDA during graph capture.
+                            next_batch.result()
                         loss = self.agent.update(data=batch)
                         self.wandb_logger.log({"Loss": loss})
             if ep_number % self.eval_every == 0:
@@ -247,6 +263,16 @@ class ModelFreeRunner(BaseRunner):
             )
             self.checkpoint_model(ep_ret, ep_number)
 
+    def _sample_batch(self):
+        """Sample a batch on the prefetch thread, leaving the wait for its device copy to the consumer.
+
+        Returns:
+            tuple: Batch dict, and the event marking its host-to-device copy (None if the buffer copies synchronously).
+        """
+        if hasattr(self.replay_buffer, "sample_batch_async"):
+            return self.replay_buffer.sample_batch_async()
+        return self.replay_buffer.sample_batch(), None
+
     def eval(self, env):
         """Evaluate model on the evaluation environment, using a deterministic agent if possible.
 
@@ -0,0 +1,49 @@
+import pytest
+import torch
+from src.agents.SACAgent import SACAgent, CUDA_GRAPH_WARMUP_STEPS
+
+
+def _agent(use_cuda_graph):
+    torch.manual_seed(0)
+    return SACAgent(
+        10,
+        0.99,
+        0.2,
+        0.995,
+        0.003,
+        "./config_files/example_sac/network.yaml",
+        compile_networks=False,
+        use_cuda_graph=use_cuda_graph,
+    )
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="requires CUDA")
+def test_graphed_update_matches_eager():
+    graphed, eager = _agent(True), _agent(False)
+    generator = torch.Generator().manual_seed(0)
+    # Run past the warmup and capture steps, so the graph is replayed several times
+    for i in range(CUDA_GRAPH_WARMUP_STEPS + 4):
+        batch = {
+            "obs": torch.rand(16, 33, generator=generator),
+            "obs2": torch.rand(16, 33, generator=generator),
+            "act": torch.rand(16, 2, generator=generator) * 2 - 1,
+            "rew": torch.rand(16, generator=generator),
+            "done": torch.zeros(16),
+        }
+        batch = {k: v.cuda() for k, v in batch.items()}
+        losses = []
+        for agent in (graphed, eager):
+            torch.manual_seed(i)
+            losses.append(agent.update(batch))
+        assert graphed.update_graph is not None or i < CUDA_GRAPH_WARMUP_STEPS
+        for graphed_loss, eager_loss in zip(*losses):
+            assert torch.allclose(graphed_loss, eager_loss, rtol=1e-4, atol=1e-5)
+    for graphed_param, eager_param in zip(
+        graphed.actor_critic.parameters(), eager.actor_critic.parameters()
+    ):
+        assert torch.allclose(graphed_param, eager_param, rtol=1e-4, atol=1e-5)
+    for graphed_param, eager_param in zip(
+        graphed.actor_critic_target.parameters(),
+        eager.actor_critic_target.parameters(),
+    ):
+        assert torch.allclose(graphed_param, eager_param, rtol=1e-4, atol=1e-5)
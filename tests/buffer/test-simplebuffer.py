@@ -0,0 +1,93 @@
+import threading
+import numpy as np
+import torch
+from src.buffers.SimpleReplayBuffer import SimpleReplayBuffer
+from src.utils.utils import ActionSample
+
+
+def _transition(i, obs_dim=3, act_dim=2):
+    action_obj = ActionSample()
+    action_obj.action = np.full(act_dim, i, dtype=np.float32)
+    return {
+        "obs": np.full(obs_dim, i, dtype=np.float32),
+        "act": action_obj,
+        "rew": float(i),
+        "next_obs": np.full(obs_dim, i + 1, dtype=np.float32),
+        "done": False,
+    }
+
+
+def test_sample_batch():
+    buffer = SimpleReplayBuffer(3, 2, 10, 4)
+    for i in range(3):
+        buffer.store(_transition(i))
+    batch = buffer.sample_batch()
+    # Check shapes and dtypes of the batch
+    assert batch["obs"].shape == (4, 3)
+    assert batch["act"].shape == (4, 2)
+    assert batch["rew"].shape == (4,)
+    assert all(v.dtype == torch.float32 for v in batch.values())
+    # Check that only stored transitions are sampled, and rows stay aligned
+    assert set(batch["rew"].tolist()) <= {0.0, 1.0, 2.0}
+    assert torch.equal(batch["obs"][:, 0], batch["rew"].to(batch["obs"].device))
+    assert torch.equal(batch["obs2"][:, 0], batch["obs"][:, 0] + 1)
+
+
+def test_ring_buffer_wraps():
+    buffer = SimpleReplayBuffer(3, 2, 4, 8)
+    for i in range(6):
+        buffer.store(_transition(i))
+    assert buffer.size == 4
+    assert buffer.ptr == 2
+    # Oldest transitions are evicted first
+    assert set(buffer.rew_buf.tolist()) == {2.0, 3.0, 4.0, 5.0}
+
+
+def test_store_batch():
+    buffer = SimpleReplayBuffer(3, 2, 4, 8)
+    buffer.store(_transition(0))
+    obs = np.arange(1, 6, dtype=np.float32)[:, None].repeat(3, axis=1)
+    buffer.store_batch(
+        torch.from_numpy(obs),
+        obs[:, :2],
+        obs[:, 0],
+        obs + 1,
+        np.zeros(5),
+    )
+    # Matches storing the same transitions one at a time
+    reference = SimpleReplayBuffer(3, 2, 4, 8)
+    for i in range(6):
+        reference.store(_transition(i))
+    assert buffer.ptr == reference.ptr
+    assert buffer.size == reference.size
+    for k, v in buffer._columns().items():
+        assert np.array_equal(v, reference._columns()[k])
+
+
+def test_concurrent_store_and_sample():
+    buffer = SimpleReplayBuffer(3, 2, 16, 8)
+    buffer.store(_transition(0))
+
+    def producer():
+        for i in range(1, 2000):
+            buffer.store(_transition(i))
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+    while thread.is_alive():
+        batch = buffer.sample_batch()
+        # Rows must never mix fields from different transitions
+        assert torch.equal(batch["obs2"][:, 0], batch["obs"][:, 0] + 1)
+        assert torch.equal(batch["act"][:, 0], batch["obs"][:, 0])
+    thread.join()
+
+
+def test_sample_batch_async():
+    buffer = SimpleReplayBuffer(3, 2, 10, 4)
+    for i in range(3):
+        buffer.store(_transition(i))
+    batch, copy_done = buffer.sample_batch_async()
+    buffer.wait_for_batch(batch, copy_done)
+    assert (copy_done is None) == (not torch.cuda.is_available())
+    assert batch["obs"].shape == (4, 3)
+    assert torch.equal(batch["obs2"][:, 0], batch["obs"][:, 0] + 1)